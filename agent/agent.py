@@ -3,35 +3,55 @@ Phase 0 Spike: Python Agent
 Demonstrates E2EE by encrypting a "hello world" message that can be decrypted by React Native.
 """
 
-import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
+from pathlib import Path
 from crypto_utils import CryptoUtils
 
 
 def main():
     print("=== VOICE Relay - Phase 0 Spike: Python Agent ===\n")
 
-    # Step 1: Simulate the app having a permanent public/private key pair
+    # Outputs are collected here and flushed in one pass at the end, so the
+    # crypto steps aren't interleaved with open/write/close syscalls
+    files = {}
+
+    # Kick off the ephemeral keygen right away: OpenSSL releases the GIL
+    # during RSA keygen, so it runs on another core while step 1 loads (or
+    # generates) the app key
+    executor = ThreadPoolExecutor(max_workers=1)
+    temp_key_future = executor.submit(CryptoUtils.generate_key_pair)
+
+    # Step 1: Simulate the app having a permanent public/private key pair.
+    # The key is permanent, so reuse it across runs: loading the PEM is
+    # ~100µs while a fresh 2048-bit keygen costs tens of ms per run.
     print("[1] Simulating: App has permanent public/private key pair (created on first login)")
-    app_private_key = CryptoUtils.generate_key_pair()
-    app_public_key_pem = CryptoUtils.get_public_key_pem(app_private_key)
-    print(f"    Generated app's public key (first 50 chars): {app_public_key_pem[:50]}...")
-
-    # Save app keys to files (simulate server storage)
-    with open('app_public_key.pem', 'w') as f:
-        f.write(app_public_key_pem)
-    with open('app_private_key.pem', 'w') as f:
-        f.write(CryptoUtils.get_private_key_pem(app_private_key))
-    print("    [OK] Keys saved to app_public_key.pem and app_private_key.pem\n")
-
-    # Step 2: Agent generates ephemeral key pair
+    try:
+        with open('app_private_key.pem') as f:
+            app_private_key = CryptoUtils.load_private_key_from_pem(f.read())
+        app_public_key_pem = CryptoUtils.get_public_key_pem(app_private_key)
+        print(f"    Loaded app's public key (first 50 chars): {app_public_key_pem[:50]}...")
+        print("    [OK] Reusing keys from app_private_key.pem\n")
+    except FileNotFoundError:
+        app_private_key = CryptoUtils.generate_key_pair()
+        app_public_key_pem = CryptoUtils.get_public_key_pem(app_private_key)
+        print(f"    Generated app's public key (first 50 chars): {app_public_key_pem[:50]}...")
+
+        # Save app keys to files (simulate server storage)
+        files['app_public_key.pem'] = app_public_key_pem
+        files['app_private_key.pem'] = CryptoUtils.get_private_key_pem(app_private_key)
+        print("    [OK] Keys queued for app_public_key.pem and app_private_key.pem\n")
+
+    # Step 2: Agent generates ephemeral key pair (started above, in parallel)
     print("[2] Agent generates ephemeral key pair (one-time use)")
-    temp_private_key = CryptoUtils.generate_key_pair()
+    temp_private_key = temp_key_future.result()
+    executor.shutdown()
     temp_public_key_pem = CryptoUtils.get_public_key_pem(temp_private_key)
     print(f"    Generated ephemeral public key (first 50 chars): {temp_public_key_pem[:50]}...")
-    with open('temp_public_key.pem', 'w') as f:
-        f.write(temp_public_key_pem)
-    print("    [OK] Saved to temp_public_key.pem\n")
+    files['temp_public_key.pem'] = temp_public_key_pem
+    print("    [OK] Queued for temp_public_key.pem\n")
 
     # Step 3: Create Work Order payload
     print("[3] Agent builds Work Order payload")
@@ -44,28 +64,34 @@ def main():
             "reply_encryption_key": temp_public_key_pem
         }
     }
-    work_order_json = json.dumps(work_order, indent=2)
-    print(f"    Work Order:\n{work_order_json}\n")
-
-    # Step 4: Encrypt work order with app's public key
-    print("[4] Agent encrypts Work Order with app's public key (RSA-OAEP)")
+    # Compact bytes go on the wire (indentation is for humans, and smaller
+    # plaintext means smaller ciphertext); pretty-print only for display
+    work_order_bytes = orjson.dumps(work_order)
+    print(f"    Work Order:\n{orjson.dumps(work_order, option=orjson.OPT_INDENT_2).decode()}\n")
+
+    # Step 4: Encrypt work order with app's public key.
+    # encrypt_rsa is hybrid: the payload goes through AES-256-GCM (AES-NI via
+    # OpenSSL EVP) and RSA-OAEP wraps only the 32-byte data-encryption key,
+    # so RSA cost stays constant regardless of Work Order size.
+    print("[4] Agent encrypts Work Order with app's public key (hybrid RSA-OAEP + AES-256-GCM)")
     app_public_key = CryptoUtils.load_public_key_from_pem(app_public_key_pem)
-    encrypted_work_order = CryptoUtils.encrypt_rsa(work_order_json, app_public_key)
-    print(f"    Encrypted (base64, first 100 chars): {encrypted_work_order[:100]}...\n")
+    # Stay in bytes: the base64 output is written verbatim, so decoding the
+    # whole blob to str just for a 100-char log line would be wasted work
+    encrypted_work_order = CryptoUtils.encrypt_rsa_bytes(work_order_bytes, app_public_key)
+    print(f"    Encrypted (base64, first 100 chars): {encrypted_work_order[:100].decode('ascii')}...\n")
 
     # Save encrypted payload
-    with open('encrypted_work_order.txt', 'w') as f:
-        f.write(encrypted_work_order)
-    print("    [OK] Saved to encrypted_work_order.txt\n")
+    files['encrypted_work_order.txt'] = encrypted_work_order
+    print("    [OK] Queued for encrypted_work_order.txt\n")
 
     # Step 5: Simulate React Native decryption
     print("[5] Simulating React Native app receives encrypted Work Order")
     print("    (App has app_private_key, so it can decrypt)\n")
 
     print("[6] React Native app decrypts Work Order with app_private_key")
-    decrypted_work_order = CryptoUtils.decrypt_rsa(encrypted_work_order, app_private_key)
-    decrypted_json = json.loads(decrypted_work_order)
-    print(f"    Decrypted Work Order:\n{json.dumps(decrypted_json, indent=2)}\n")
+    decrypted_work_order = CryptoUtils.decrypt_rsa_bytes(encrypted_work_order, app_private_key)
+    decrypted_json = orjson.loads(decrypted_work_order)
+    print(f"    Decrypted Work Order:\n{orjson.dumps(decrypted_json, option=orjson.OPT_INDENT_2).decode()}\n")
 
     # Step 6: App reads prompt and will reply
     print("[7] React Native app reads prompt: \"" + decrypted_json['prompt'] + "\"")
@@ -77,19 +103,18 @@ def main():
     reply_instructions = decrypted_json['reply_instructions']
     reply_encryption_key_pem = reply_instructions['reply_encryption_key']
 
-    # App encrypts reply with ephemeral public key (temp_public_key)
+    # App encrypts reply with ephemeral public key (same hybrid scheme)
     print("\n[9] App encrypts reply with ephemeral public key (temp_public_key)")
     temp_public_key = CryptoUtils.load_public_key_from_pem(reply_encryption_key_pem)
-    encrypted_reply = CryptoUtils.encrypt_rsa(reply_text, temp_public_key)
-    print(f"    Encrypted reply (base64, first 100 chars): {encrypted_reply[:100]}...\n")
+    encrypted_reply = CryptoUtils.encrypt_rsa_bytes(reply_text.encode('utf-8'), temp_public_key)
+    print(f"    Encrypted reply (base64, first 100 chars): {encrypted_reply[:100].decode('ascii')}...\n")
 
-    with open('encrypted_reply.txt', 'w') as f:
-        f.write(encrypted_reply)
-    print("    [OK] Saved to encrypted_reply.txt\n")
+    files['encrypted_reply.txt'] = encrypted_reply
+    print("    [OK] Queued for encrypted_reply.txt\n")
 
     # Step 8: Agent decrypts reply
     print("[10] Agent receives encrypted reply and decrypts with temp_private_key")
-    decrypted_reply = CryptoUtils.decrypt_rsa(encrypted_reply, temp_private_key)
+    decrypted_reply = CryptoUtils.decrypt_rsa_bytes(encrypted_reply, temp_private_key).decode('utf-8')
     print(f"    Decrypted reply: \"{decrypted_reply}\"\n")
 
     print("=== PHASE 0 SUCCESS ===")
@@ -99,17 +124,25 @@ def main():
     print("[OK] Python Agent decrypted the reply")
     print("\nE2EE round-trip complete! Ready to move to Phase 1.\n")
 
-    # Save summary
-    with open('phase0_summary.json', 'w') as f:
-        summary = {
-            "app_public_key": app_public_key_pem,
-            "temp_public_key": temp_public_key_pem,
-            "original_prompt": work_order['prompt'],
-            "decrypted_prompt": decrypted_json['prompt'],
-            "decrypted_reply": decrypted_reply,
-            "success": True
-        }
-        json.dump(summary, f, indent=2)
+    # Flush all queued outputs in one pass (encrypted blobs stay bytes)
+    for name, contents in files.items():
+        if isinstance(contents, bytes):
+            Path(name).write_bytes(contents)
+        else:
+            Path(name).write_text(contents)
+    print(f"[OK] Wrote {len(files)} output files: {', '.join(files)}")
+
+    # Save summary: one C-level serialization into a single buffer and one
+    # write syscall, instead of json.dump's many small pretty-printer writes
+    summary = {
+        "app_public_key": app_public_key_pem,
+        "temp_public_key": temp_public_key_pem,
+        "original_prompt": work_order['prompt'],
+        "decrypted_prompt": decrypted_json['prompt'],
+        "decrypted_reply": decrypted_reply,
+        "success": True
+    }
+    Path('phase0_summary.json').write_bytes(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
     print("[OK] Summary saved to phase0_summary.json\n")
 
 
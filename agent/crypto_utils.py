@@ -3,13 +3,53 @@ Cryptographic utilities for Phase 0 E2EE spike.
 Uses RSA for key exchange and AES for symmetric encryption.
 """
 
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+from cryptography.hazmat.primitives.asymmetric import rsa, padding, x25519
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.backends import default_backend
 import os
 import json
-import base64
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    # SIMD-accelerated base64 (SSSE3/AVX2/NEON); drop-in stdlib replacement
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+# Resolved once at import time: default_backend() returns a singleton, but the
+# lookup still costs a function call on every crypto operation.
+_BACKEND = default_backend()
+
+# OAEP parameters are constants; build the padding object once instead of on
+# every RSA encrypt/decrypt call.
+_OAEP_PADDING = padding.OAEP(
+    mgf=padding.MGF1(algorithm=hashes.SHA256()),
+    algorithm=hashes.SHA256(),
+    label=None
+)
+
+
+# PEM parsing costs ~100µs per call; key objects are immutable, so cache them
+# keyed by the PEM text instead of re-parsing the same key on every call.
+@lru_cache(maxsize=4096)
+def _load_private_key(pem_string):
+    return serialization.load_pem_private_key(
+        pem_string.encode('utf-8'),
+        password=None,
+        backend=_BACKEND
+    )
+
+
+@lru_cache(maxsize=4096)
+def _load_public_key(pem_string):
+    return serialization.load_pem_public_key(
+        pem_string.encode('utf-8'),
+        backend=_BACKEND
+    )
 
 
 class CryptoUtils:
@@ -23,7 +63,7 @@ class CryptoUtils:
         private_key = rsa.generate_private_key(
             public_exponent=65537,
             key_size=CryptoUtils.KEY_SIZE,
-            backend=default_backend()
+            backend=_BACKEND
         )
         return private_key
 
@@ -49,24 +89,13 @@ class CryptoUtils:
 
     @staticmethod
     def load_private_key_from_pem(pem_string):
-        """Load private key from PEM string."""
-        pem_bytes = pem_string.encode('utf-8')
-        private_key = serialization.load_pem_private_key(
-            pem_bytes,
-            password=None,
-            backend=default_backend()
-        )
-        return private_key
+        """Load private key from PEM string (cached per PEM)."""
+        return _load_private_key(pem_string)
 
     @staticmethod
     def load_public_key_from_pem(pem_string):
-        """Load public key from PEM string."""
-        pem_bytes = pem_string.encode('utf-8')
-        public_key = serialization.load_pem_public_key(
-            pem_bytes,
-            backend=default_backend()
-        )
-        return public_key
+        """Load public key from PEM string (cached per PEM)."""
+        return _load_public_key(pem_string)
 
     @staticmethod
     def generate_aes_key():
@@ -74,108 +103,242 @@ class CryptoUtils:
         return os.urandom(32)
 
     @staticmethod
-    def encrypt_aes(plaintext, aes_key):
-        """Encrypt plaintext using AES-256-GCM. Returns (IV + ciphertext + tag) base64-encoded."""
+    def encrypt_aes_bytes(plaintext, aes_key):
+        """Encrypt plaintext bytes using AES-256-GCM. Returns base64 bytes of (IV + ciphertext + tag)."""
         iv = os.urandom(12)  # 96-bit IV for GCM
-        cipher = Cipher(
-            algorithms.AES(aes_key),
-            modes.GCM(iv),
-            backend=default_backend()
-        )
-        encryptor = cipher.encryptor()
-        ciphertext = encryptor.update(plaintext.encode('utf-8')) + encryptor.finalize()
+        # One-shot AEAD call; AESGCM appends the 16-byte tag to the ciphertext,
+        # matching the existing IV + ciphertext + tag wire format.
+        ciphertext = AESGCM(aes_key).encrypt(iv, plaintext, None)
 
-        # Combine IV + ciphertext + tag, then base64 encode
-        encrypted_data = iv + ciphertext + encryptor.tag
-        return base64.b64encode(encrypted_data).decode('utf-8')
+        # Assemble IV || ciphertext into one preallocated buffer instead of
+        # concatenating with `+`, which would allocate an intermediate copy
+        buf = bytearray(12 + len(ciphertext))
+        buf[:12] = iv
+        buf[12:] = ciphertext
+        return base64.b64encode(buf)
 
     @staticmethod
-    def decrypt_aes(encrypted_data_b64, aes_key):
-        """Decrypt AES-256-GCM encrypted data. Expects base64-encoded (IV + ciphertext + tag)."""
+    def decrypt_aes_bytes(encrypted_data_b64, aes_key):
+        """Decrypt AES-256-GCM encrypted data to bytes. Expects base64-encoded (IV + ciphertext + tag)."""
         encrypted_data = base64.b64decode(encrypted_data_b64)
 
-        iv = encrypted_data[:12]
-        ciphertext = encrypted_data[12:-16]
-        tag = encrypted_data[-16:]
+        # memoryview slices hand the ciphertext to OpenSSL without copying it
+        view = memoryview(encrypted_data)
+        return AESGCM(aes_key).decrypt(bytes(view[:12]), view[12:], None)
 
-        cipher = Cipher(
-            algorithms.AES(aes_key),
-            modes.GCM(iv, tag),
-            backend=default_backend()
-        )
-        decryptor = cipher.decryptor()
-        plaintext = decryptor.update(ciphertext) + decryptor.finalize()
+    @staticmethod
+    def encrypt_aes_batch(plaintexts, aes_key, max_workers=None):
+        """
+        Encrypt a batch of plaintext bytes blobs with one session key.
 
-        return plaintext.decode('utf-8')
+        Builds a single AESGCM instance (one key schedule) and fans the
+        blobs out over a thread pool: cryptography releases the GIL inside
+        OpenSSL, so the AES-GCM work genuinely runs in parallel. Returns
+        base64 bytes per blob, same wire format as encrypt_aes_bytes.
+        """
+        aead = AESGCM(aes_key)
+
+        def _encrypt_one(plaintext):
+            iv = os.urandom(12)
+            ciphertext = aead.encrypt(iv, plaintext, None)
+            buf = bytearray(12 + len(ciphertext))
+            buf[:12] = iv
+            buf[12:] = ciphertext
+            return base64.b64encode(buf)
+
+        if len(plaintexts) < 2:
+            return [_encrypt_one(p) for p in plaintexts]
+
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            return list(executor.map(_encrypt_one, plaintexts))
 
     @staticmethod
-    def encrypt_rsa(plaintext, public_key):
+    def encrypt_aes(plaintext, aes_key):
+        """Encrypt a str using AES-256-GCM. Returns (IV + ciphertext + tag) base64-encoded."""
+        return CryptoUtils.encrypt_aes_bytes(plaintext.encode('utf-8'), aes_key).decode('ascii')
+
+    @staticmethod
+    def decrypt_aes(encrypted_data_b64, aes_key):
+        """Decrypt AES-256-GCM encrypted data to a str. Expects base64-encoded (IV + ciphertext + tag)."""
+        return CryptoUtils.decrypt_aes_bytes(encrypted_data_b64, aes_key).decode('utf-8')
+
+    @staticmethod
+    def encrypt_rsa_bytes(plaintext, public_key):
         """
-        Hybrid encryption: RSA + AES-256-GCM.
+        Hybrid encryption: RSA + AES-256-GCM over plaintext bytes.
         For large payloads, we encrypt with AES and wrap the AES key with RSA.
-        Returns base64-encoded (RSA_encrypted_aes_key || AES_encrypted_payload).
+        Returns base64 bytes of (RSA_encrypted_aes_key || AES_encrypted_payload).
         """
-        # Generate a random AES-256 key
-        aes_key = CryptoUtils.generate_aes_key()
+        # One getrandom(2) syscall covers both the AES-256 key and the
+        # 96-bit GCM IV, instead of two back-to-back urandom calls
+        rand = os.urandom(44)
+        aes_key = rand[:32]
+        iv = rand[32:]
 
-        # Encrypt plaintext with AES-256-GCM
-        iv = os.urandom(12)  # 96-bit IV for GCM
-        cipher = Cipher(
-            algorithms.AES(aes_key),
-            modes.GCM(iv),
-            backend=default_backend()
-        )
-        encryptor = cipher.encryptor()
-        ciphertext = encryptor.update(plaintext.encode('utf-8')) + encryptor.finalize()
+        # Encrypt plaintext with AES-256-GCM (one-shot AEAD; tag is appended)
+        ciphertext = AESGCM(aes_key).encrypt(iv, plaintext, None)
 
         # Encrypt AES key with RSA-OAEP
         encrypted_aes_key = public_key.encrypt(
             aes_key,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
+            _OAEP_PADDING
         )
 
-        # Combine: RSA(aes_key) || IV || AES(plaintext) || GCM_TAG
-        combined = encrypted_aes_key + iv + ciphertext + encryptor.tag
-        return base64.b64encode(combined).decode('utf-8')
+        # Combine RSA(aes_key) || IV || AES(plaintext) || GCM_TAG into one
+        # preallocated buffer; 3-way `+` would allocate intermediate copies
+        key_len = len(encrypted_aes_key)
+        buf = bytearray(key_len + 12 + len(ciphertext))
+        buf[:key_len] = encrypted_aes_key
+        buf[key_len:key_len + 12] = iv
+        buf[key_len + 12:] = ciphertext
+        return base64.b64encode(buf)
 
     @staticmethod
-    def decrypt_rsa(encrypted_data_b64, private_key):
+    def encrypt_rsa_batch(plaintexts, public_key):
+        """
+        Hybrid-encrypt a batch of bytes blobs, amortizing the RSA work.
+
+        One AES session key is generated and RSA-OAEP-wrapped once; each
+        blob then only pays an AES-GCM pass with a fresh IV. Every output
+        is a standalone (RSA_encrypted_aes_key || IV || ciphertext || tag)
+        base64 blob, so decrypt_rsa_bytes handles each one unchanged.
         """
-        Decrypt hybrid encrypted data (RSA + AES-256-GCM).
+        aes_key = os.urandom(32)
+        encrypted_aes_key = public_key.encrypt(aes_key, _OAEP_PADDING)
+        key_len = len(encrypted_aes_key)
+        aead = AESGCM(aes_key)
+
+        results = []
+        for plaintext in plaintexts:
+            iv = os.urandom(12)
+            ciphertext = aead.encrypt(iv, plaintext, None)
+            buf = bytearray(key_len + 12 + len(ciphertext))
+            buf[:key_len] = encrypted_aes_key
+            buf[key_len:key_len + 12] = iv
+            buf[key_len + 12:] = ciphertext
+            results.append(base64.b64encode(buf))
+        return results
+
+    @staticmethod
+    def decrypt_rsa_bytes(encrypted_data_b64, private_key):
+        """
+        Decrypt hybrid encrypted data (RSA + AES-256-GCM) to bytes.
         Expects base64-encoded (RSA_encrypted_aes_key || AES_encrypted_payload).
         """
         encrypted_data = base64.b64decode(encrypted_data_b64)
+        view = memoryview(encrypted_data)
 
         # Extract RSA encrypted AES key (256 bytes for 2048-bit RSA)
-        encrypted_aes_key = encrypted_data[:256]
-        remaining = encrypted_data[256:]
-
         # Decrypt AES key with RSA
         aes_key = private_key.decrypt(
-            encrypted_aes_key,
-            padding.OAEP(
-                mgf=padding.MGF1(algorithm=hashes.SHA256()),
-                algorithm=hashes.SHA256(),
-                label=None
-            )
+            bytes(view[:256]),
+            _OAEP_PADDING
         )
 
-        # Extract IV (12 bytes), GCM tag (16 bytes), ciphertext (rest)
-        iv = remaining[:12]
-        ciphertext = remaining[12:-16]
-        tag = remaining[-16:]
+        # Extract IV (12 bytes), then decrypt ciphertext + tag in one AEAD
+        # call; memoryview slices avoid copying the ciphertext
+        return AESGCM(aes_key).decrypt(bytes(view[256:268]), view[268:], None)
 
-        # Decrypt with AES-256-GCM
-        cipher = Cipher(
-            algorithms.AES(aes_key),
-            modes.GCM(iv, tag),
-            backend=default_backend()
-        )
-        decryptor = cipher.decryptor()
-        plaintext = decryptor.update(ciphertext) + decryptor.finalize()
+    @staticmethod
+    def generate_x25519_key_pair():
+        """Generate a new X25519 private key (public key via .public_key())."""
+        return x25519.X25519PrivateKey.generate()
+
+    @staticmethod
+    def encrypt_hybrid_x25519(plaintext, public_key):
+        """
+        Hybrid encryption: X25519 ECDH + HKDF-SHA256 + AES-256-GCM.
+        Curve25519 scalar mult is ~20x faster than an RSA-2048 private-key op,
+        and the 32-byte ephemeral public key replaces the 256-byte RSA wrap.
+        Returns base64 bytes of (ephemeral_pub || IV || ciphertext || tag).
+        """
+        ephemeral_key = x25519.X25519PrivateKey.generate()
+        shared_secret = ephemeral_key.exchange(public_key)
+        aes_key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b'voice-relay-hybrid-v1',
+            backend=_BACKEND
+        ).derive(shared_secret)
+
+        iv = os.urandom(12)
+        ciphertext = AESGCM(aes_key).encrypt(iv, plaintext, None)
+
+        ephemeral_pub = ephemeral_key.public_key().public_bytes_raw()
+        buf = bytearray(32 + 12 + len(ciphertext))
+        buf[:32] = ephemeral_pub
+        buf[32:44] = iv
+        buf[44:] = ciphertext
+        return base64.b64encode(buf)
+
+    @staticmethod
+    def decrypt_hybrid_x25519(encrypted_data_b64, private_key):
+        """Decrypt X25519 hybrid data to bytes (see encrypt_hybrid_x25519)."""
+        encrypted_data = base64.b64decode(encrypted_data_b64)
+        view = memoryview(encrypted_data)
+
+        ephemeral_pub = x25519.X25519PublicKey.from_public_bytes(bytes(view[:32]))
+        shared_secret = private_key.exchange(ephemeral_pub)
+        aes_key = HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=b'voice-relay-hybrid-v1',
+            backend=_BACKEND
+        ).derive(shared_secret)
+
+        return AESGCM(aes_key).decrypt(bytes(view[32:44]), view[44:], None)
+
+    @staticmethod
+    def encrypt_rsa(plaintext, public_key):
+        """
+        Hybrid-encrypt a str. Returns a base64 str.
+
+        Dispatches on the key type: X25519 keys take the ECDH+HKDF path,
+        RSA keys keep the original OAEP key-wrap wire format.
+        """
+        data = plaintext.encode('utf-8')
+        if isinstance(public_key, x25519.X25519PublicKey):
+            return CryptoUtils.encrypt_hybrid_x25519(data, public_key).decode('ascii')
+        return CryptoUtils.encrypt_rsa_bytes(data, public_key).decode('ascii')
+
+    @staticmethod
+    def decrypt_rsa(encrypted_data_b64, private_key):
+        """Decrypt hybrid encrypted data to a str (dispatches on key type)."""
+        if isinstance(private_key, x25519.X25519PrivateKey):
+            return CryptoUtils.decrypt_hybrid_x25519(encrypted_data_b64, private_key).decode('utf-8')
+        return CryptoUtils.decrypt_rsa_bytes(encrypted_data_b64, private_key).decode('utf-8')
+
+
+class RSAKeyPool:
+    """
+    Pre-warmed pool of RSA key pairs.
+
+    2048-bit keygen blocks for tens of ms; callers that need ephemeral keys
+    on a latency-sensitive path (e.g. one temp key per Work Order) can take
+    a pre-generated key in O(1) while background threads refill the pool.
+    OpenSSL releases the GIL during keygen, so worker threads run in
+    parallel with the caller.
+    """
+
+    def __init__(self, size=4, workers=2):
+        self._queue = queue.Queue(maxsize=size)
+        self._executor = ThreadPoolExecutor(max_workers=workers)
+        for _ in range(size):
+            self._executor.submit(self._generate_one)
+
+    def _generate_one(self):
+        try:
+            self._queue.put_nowait(CryptoUtils.generate_key_pair())
+        except queue.Full:
+            pass
 
-        return plaintext.decode('utf-8')
+    def get(self):
+        """Take a key from the pool (generates inline if the pool is empty)."""
+        try:
+            key = self._queue.get_nowait()
+        except queue.Empty:
+            return CryptoUtils.generate_key_pair()
+        self._executor.submit(self._generate_one)
+        return key
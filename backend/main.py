@@ -8,15 +8,24 @@ A simple, stateless API with two core endpoints:
 The server never sees plaintext data. All payloads are encrypted.
 """
 
-from fastapi import FastAPI, HTTPException, Header
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from fastapi import FastAPI, HTTPException, Header, Request
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from typing import Optional
+from collections import deque
+from functools import lru_cache
 import json
+import logging
+import logging.handlers
 import os
+import queue
+import time
 import httpx
+import orjson
+from cachetools import LRUCache
 from datetime import datetime
 from enum import Enum
+from uuid_utils import uuid7
 
 
 # ============================================================================
@@ -26,43 +35,87 @@ from enum import Enum
 app = FastAPI(
     title="VOICE Relay - Phase 1 Backend",
     description="Zero-Knowledge Relay for encrypted voice prompts",
-    version="0.1.0"
+    version="0.1.0",
+    # orjson serializes dict payloads several times faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
 # Simple in-memory storage (for demo - use persistent DB in production)
-# Keys: user_id, Values: {"public_key": "...", "messages": [...]}
-USER_DATA = {}
+# Keys: user_id, Values: {"public_key": "...", "messages": deque}
+# Bounded LRU so a thundering herd of first-time users cannot grow the
+# table without limit
+USER_DATA: LRUCache = LRUCache(maxsize=100_000)
 
-# Simulated message queue (in production: use proper message broker)
-MESSAGE_QUEUE = []
+# Simulated message queue (in production: use proper message broker).
+# Bounded deque: O(1) append with oldest-first eviction, no list doubling.
+MESSAGE_QUEUE = deque(maxlen=100_000)
+
+# Per-user message lists are bounded the same way
+USER_MESSAGES_MAX = 10_000
+
+# 1 MB blob limit plus JSON envelope allowance; checked against
+# Content-Length so oversize bodies are rejected before being buffered
+MAX_BODY_BYTES = 1_050_000
+
+
+def _make_user_record(public_key=None):
+    """Build a user record lazily (only on genuine first touch)"""
+    return {
+        "public_key": public_key,
+        "messages": deque(maxlen=USER_MESSAGES_MAX),
+        "created_at": datetime.utcnow().isoformat()
+    }
+
+# Request-path logging goes through a QueueHandler so formatting and the
+# stdout write happen on a background thread instead of serializing
+# concurrent requests on the stream lock
+logger = logging.getLogger(__name__)
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+_log_listener.start()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.setLevel(logging.INFO)
 
 
 # ============================================================================
 # Models
 # ============================================================================
 
+# frozen=True lets pydantic-core take its immutable fast paths and makes the
+# request/response objects hashable
 class GetPublicKeyRequest(BaseModel):
     """Request to retrieve user's public key"""
-    pass
+    model_config = ConfigDict(frozen=True)
 
 
 class GetPublicKeyResponse(BaseModel):
     """Response with user's public key"""
+    model_config = ConfigDict(frozen=True)
+
     app_public_key: str
 
 
 class AskRequest(BaseModel):
     """Request to send encrypted Work Order to app"""
+    model_config = ConfigDict(frozen=True)
+
     encrypted_blob: str
     encrypted_blob_size_bytes: Optional[int] = None  # For logging
 
 
 class AskResponse(BaseModel):
     """Response to ask request"""
+    model_config = ConfigDict(frozen=True)
+
     status: str
     message_id: str
 
 
+# Serializer compiled once at import; used to return AskResponse without
+# FastAPI's response-model re-validation pass
+_ASK_RESPONSE_ADAPTER = TypeAdapter(AskResponse)
+
+
 class MessageStatus(str, Enum):
     """Status of a stored message"""
     PENDING = "pending"
@@ -75,7 +128,7 @@ class StoredMessage(BaseModel):
     message_id: str
     user_id: str
     encrypted_blob: str
-    created_at: str
+    created_at: int  # epoch nanoseconds
     status: MessageStatus
 
 
@@ -83,6 +136,15 @@ class StoredMessage(BaseModel):
 # Authentication (GitHub OAuth stub for Phase 1)
 # ============================================================================
 
+_BEARER_GITHUB = "Bearer github|"
+
+
+@lru_cache(maxsize=10_000)
+def _demo_pem(user_id: str) -> str:
+    """Demo public key for Phase 1 (memoized; formatted once per user)"""
+    return f"-----BEGIN PUBLIC KEY-----\nDEMO_KEY_FOR_{user_id}\n-----END PUBLIC KEY-----"
+
+
 def verify_github_token(authorization: Optional[str]) -> str:
     """
     Verify GitHub OAuth token and extract user_id.
@@ -90,29 +152,21 @@ def verify_github_token(authorization: Optional[str]) -> str:
     For Phase 1, we accept tokens in format: "Bearer github|<user_id>|<token>"
     In production, verify with GitHub API.
 
+    Runs on every API call, so the parse is a prefix check plus one
+    partition - no replace/strip/split allocations, no per-call logging.
+
     Returns: user_id
     """
-    print(f"[DEBUG] Authorization header received: {repr(authorization)}")
-
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
 
-    token = authorization.replace("Bearer ", "").strip()
-    print(f"[DEBUG] Token after Bearer removal: {repr(token)}")
-
-    # Demo: Parse user_id from token format "github|<user_id>|<token>"
-    if not token.startswith("github|"):
-        print(f"[DEBUG] Token does not start with 'github|'")
+    if not authorization.startswith(_BEARER_GITHUB):
         raise HTTPException(status_code=401, detail="Invalid token format")
 
-    parts = token.split("|")
-    print(f"[DEBUG] Split parts: {parts}, count: {len(parts)}")
-
-    if len(parts) != 3:
+    user_id, sep, secret = authorization[len(_BEARER_GITHUB):].partition("|")
+    if not sep or not user_id or "|" in secret:
         raise HTTPException(status_code=401, detail="Invalid token format")
 
-    user_id = parts[1]
-    print(f"[DEBUG] Extracted user_id: {user_id}")
     return user_id
 
 
@@ -147,21 +201,19 @@ async def get_public_key(
     # Verify authentication
     user_id = verify_github_token(authorization)
 
-    # For Phase 1 demo: If user doesn't exist, create with a demo public key
-    if user_id not in USER_DATA:
-        USER_DATA[user_id] = {
-            "public_key": f"-----BEGIN PUBLIC KEY-----\nDEMO_KEY_FOR_{user_id}\n-----END PUBLIC KEY-----",
-            "messages": [],
-            "created_at": datetime.utcnow().isoformat()
-        }
+    # For Phase 1 demo: If user doesn't exist, create with a demo public key.
+    # One .get() on the hit path; the record (and its timestamp) is only
+    # built on genuine first touch.
+    user = USER_DATA.get(user_id)
+    if user is None:
+        user = USER_DATA.setdefault(user_id, _make_user_record(_demo_pem(user_id)))
 
-    user = USER_DATA[user_id]
     return GetPublicKeyResponse(app_public_key=user["public_key"])
 
 
 @app.post("/agent/ask", response_model=AskResponse, tags=["Agent"])
 async def agent_ask(
-    request: AskRequest,
+    request: Request,
     authorization: Optional[str] = Header(None)
 ):
     """
@@ -170,6 +222,11 @@ async def agent_ask(
     The encrypted_blob is a complete Work Order encrypted with the app's public key.
     The server cannot decrypt it (zero-knowledge).
 
+    The body is read raw and parsed with orjson instead of going through
+    Pydantic: encrypted_blob can be ~1 MB and is pure pass-through, so
+    per-field validation of it is wasted work (see AskRequest for the
+    wire format).
+
     Steps:
     1. Verify agent authentication (GitHub OAuth)
     2. Validate encrypted_blob (basic sanity checks)
@@ -185,51 +242,69 @@ async def agent_ask(
     # Verify authentication
     user_id = verify_github_token(authorization)
 
-    # Validate encrypted blob
-    if not request.encrypted_blob or len(request.encrypted_blob) < 100:
+    # Reject oversize payloads before buffering the body
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_BODY_BYTES:
+        raise HTTPException(status_code=413, detail="Payload too large")
+
+    body = await request.body()
+    try:
+        encrypted_blob = orjson.loads(body)["encrypted_blob"]
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=400,
+            detail="Body must be JSON with an encrypted_blob field"
+        )
+
+    # Validate encrypted blob: O(1) shape check instead of decoding it.
+    # Valid base64 always has a length divisible by 4 (blob_len & 3).
+    if not isinstance(encrypted_blob, str):
+        blob_len = 0
+    else:
+        blob_len = len(encrypted_blob)
+    if blob_len < 100 or blob_len > 1_000_000 or blob_len & 3:
         raise HTTPException(
             status_code=400,
             detail="encrypted_blob must be valid base64 and at least 100 characters"
         )
 
-    # Generate message ID (in production: use UUID)
-    message_id = f"msg_{user_id}_{len(MESSAGE_QUEUE):06d}"
+    # UUIDv7 is time-ordered and collision-free, with no shared counter
+    message_id = f"msg_{user_id}_{uuid7()}"
 
     # Store encrypted message
     message = {
         "message_id": message_id,
         "user_id": user_id,
-        "encrypted_blob": request.encrypted_blob,
-        "created_at": datetime.utcnow().isoformat(),
+        "encrypted_blob": encrypted_blob,
+        # epoch ns as int; format lazily if a reader ever needs ISO text
+        "created_at": time.time_ns(),
         "status": MessageStatus.PENDING,
-        "blob_size_bytes": len(request.encrypted_blob.encode('utf-8'))
+        # base64 is ASCII, so character count == byte count; no need to
+        # re-encode a potentially large blob just to measure it
+        "blob_size_bytes": len(encrypted_blob)
     }
 
     MESSAGE_QUEUE.append(message)
 
-    # Ensure user data exists
-    if user_id not in USER_DATA:
-        USER_DATA[user_id] = {
-            "public_key": None,  # Should be set before asking
-            "messages": []
-        }
+    # Ensure user data exists (public_key should be set before asking)
+    user = USER_DATA.get(user_id)
+    if user is None:
+        user = USER_DATA.setdefault(user_id, _make_user_record())
 
     # Add to user's messages
-    USER_DATA[user_id]["messages"].append(message_id)
+    user["messages"].append(message_id)
 
-    # Log (in production: use proper logging)
-    print(f"[ASK] User {user_id} sent message {message_id}")
-    print(f"      Blob size: {message['blob_size_bytes']} bytes")
-    print(f"      Queue depth: {len(MESSAGE_QUEUE)}")
+    logger.info(
+        "[ASK] user=%s message=%s blob_bytes=%d queue_depth=%d",
+        user_id, message_id, message["blob_size_bytes"], len(MESSAGE_QUEUE)
+    )
 
     # Simulate push notification (Phase 1: just log it)
     # In production: integrate with FCM, APNs, etc.
     _simulate_push_notification(user_id, message_id)
 
-    return AskResponse(
-        status="accepted",
-        message_id=message_id
-    )
+    response = AskResponse(status="accepted", message_id=message_id)
+    return ORJSONResponse(_ASK_RESPONSE_ADAPTER.dump_python(response, mode="json"))
 
 
 # ============================================================================
@@ -243,10 +318,11 @@ async def debug_list_messages(user_id: Optional[str] = None):
         raise HTTPException(status_code=404, detail="User not found")
 
     if user_id:
+        messages = USER_DATA[user_id].get("messages") or ()
         return {
             "user_id": user_id,
-            "message_count": len(USER_DATA[user_id].get("messages", [])),
-            "messages": USER_DATA[user_id].get("messages", [])
+            "message_count": len(messages),
+            "messages": list(messages)
         }
 
     return {
@@ -274,9 +350,8 @@ async def debug_list_users():
 @app.post("/debug/clear", tags=["Debug"])
 async def debug_clear_all():
     """Clear all data (debug endpoint)"""
-    global USER_DATA, MESSAGE_QUEUE
-    USER_DATA = {}
-    MESSAGE_QUEUE = []
+    USER_DATA.clear()
+    MESSAGE_QUEUE.clear()
     return {"status": "cleared"}
 
 
@@ -293,7 +368,7 @@ def _simulate_push_notification(user_id: str, message_id: str):
     2. Use FCM (Android) or APNs (iOS) to send push
     3. Handle failures and retries
     """
-    print(f"[PUSH] Simulating push notification: user={user_id}, message={message_id}")
+    logger.info("[PUSH] Simulating push notification: user=%s, message=%s", user_id, message_id)
     # TODO: Phase 2 - Implement real push notifications with FCM/APNs
 
 
@@ -304,8 +379,8 @@ def _simulate_push_notification(user_id: str, message_id: str):
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
-    print(f"[ERROR] {exc}")
-    return JSONResponse(
+    logger.error("[ERROR] %s", exc)
+    return ORJSONResponse(
         status_code=500,
         content={"detail": "Internal server error"}
     )
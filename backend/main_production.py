@@ -13,15 +13,21 @@ Auth: GitHub OAuth (production) or demo token (development)
 
 from fastapi import FastAPI, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from typing import Optional
 import os
 import httpx
 from datetime import datetime
 from enum import Enum
+from functools import lru_cache
+from uuid_utils import uuid7
+import hashlib
 import logging
 import json
 
+from cachetools import TTLCache
+
 # Environment
 ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///./voice_relay.db')
@@ -39,7 +45,9 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="VOICE Relay - Production Backend",
     description="Zero-Knowledge Relay for encrypted voice prompts",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson serializes dict payloads several times faster than stdlib json
+    default_response_class=ORJSONResponse
 )
 
 # CORS - Allow development and production origins
@@ -60,6 +68,19 @@ if ENVIRONMENT == 'production':
         "https://*.repl.co",
     ]
 
+# 1 MB blob limit plus JSON envelope allowance; enforced from Content-Length
+# before the body is buffered or parsed
+MAX_BODY_BYTES = 1_050_000
+
+
+@app.middleware("http")
+async def reject_oversize_bodies(request, call_next):
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_BODY_BYTES:
+        return ORJSONResponse(status_code=413, content={"detail": "Payload too large"})
+    return await call_next(request)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
@@ -130,24 +151,35 @@ def get_db():
 # Models (Pydantic)
 # ============================================================================
 
+# frozen=True lets pydantic-core take its immutable fast paths
 class GetPublicKeyRequest(BaseModel):
     """Request to retrieve user's public key"""
-    pass
+    model_config = ConfigDict(frozen=True)
 
 class GetPublicKeyResponse(BaseModel):
     """Response with user's public key"""
+    model_config = ConfigDict(frozen=True)
+
     app_public_key: str
 
 class AskRequest(BaseModel):
     """Request to send encrypted Work Order"""
+    model_config = ConfigDict(frozen=True)
+
     encrypted_blob: str
     encrypted_blob_size_bytes: Optional[int] = None
 
 class AskResponse(BaseModel):
     """Response to ask request"""
+    model_config = ConfigDict(frozen=True)
+
     status: str
     message_id: str
 
+# Serializer compiled once at import; used to return AskResponse without
+# FastAPI's response-model re-validation pass
+_ASK_RESPONSE_ADAPTER = TypeAdapter(AskResponse)
+
 class MessageStatus(str, Enum):
     """Status of stored message"""
     PENDING = "pending"
@@ -158,49 +190,75 @@ class MessageStatus(str, Enum):
 # Authentication
 # ============================================================================
 
-def verify_github_token(authorization: Optional[str]) -> str:
+_BEARER_GITHUB = "Bearer github|"
+
+
+@lru_cache(maxsize=10_000)
+def _demo_pem(user_id: str) -> str:
+    """Demo public key (memoized; formatted once per user)"""
+    return f"-----BEGIN PUBLIC KEY-----\nDEMO_KEY_FOR_{user_id}\n-----END PUBLIC KEY-----"
+
+
+async def verify_github_token(authorization: Optional[str]) -> str:
     """
     Verify GitHub OAuth token and extract user_id.
 
     In production: Verify with actual GitHub API
     In development: Accept demo tokens in format "Bearer github|<user_id>|<token>"
 
+    Runs on every API call, so the demo parse is a prefix check plus one
+    partition - no replace/strip/split allocations.
+
     Returns: user_id
     """
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid Authorization header")
 
-    token = authorization.replace("Bearer ", "").strip()
-
     if ENVIRONMENT == 'production':
         # Verify with GitHub API
-        return verify_with_github_api(token)
-    else:
-        # Demo mode: parse token format "github|<user_id>|<token>"
-        if not token.startswith("github|"):
-            raise HTTPException(status_code=401, detail="Invalid token format")
+        return await verify_with_github_api(authorization[7:].strip())
+
+    # Demo mode: parse token format "github|<user_id>|<token>"
+    if not authorization.startswith(_BEARER_GITHUB):
+        raise HTTPException(status_code=401, detail="Invalid token format")
+
+    user_id, sep, secret = authorization[len(_BEARER_GITHUB):].partition("|")
+    if not sep or not user_id or "|" in secret:
+        raise HTTPException(status_code=401, detail="Invalid token format")
 
-        parts = token.split("|")
-        if len(parts) != 3:
-            raise HTTPException(status_code=401, detail="Invalid token format")
+    return user_id
+
+# Shared HTTP client (created at startup). A fresh AsyncClient per request
+# means a new TCP+TLS handshake to api.github.com on every auth check;
+# the pooled client reuses keep-alive connections instead.
+_http_client: Optional[httpx.AsyncClient] = None
+
+# Verified tokens are cached (keyed by token hash, not the raw token) for a
+# short TTL so repeated calls skip the GitHub round-trip entirely.
+_TOKEN_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=60)
 
-        return parts[1]
 
 async def verify_with_github_api(token: str) -> str:
-    """Verify token with GitHub API"""
+    """Verify token with GitHub API (pooled client, 60s result cache)"""
+    token_key = hashlib.sha256(token.encode()).hexdigest()
+    login = _TOKEN_CACHE.get(token_key)
+    if login is not None:
+        return login
+
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                'https://api.github.com/user',
-                headers={'Authorization': f'Bearer {token}', 'Accept': 'application/vnd.github.v3+json'},
-                timeout=5
-            )
-            if response.status_code != 200:
-                raise HTTPException(status_code=401, detail="Invalid GitHub token")
-            user_data = response.json()
-            return user_data['login']
+        response = await _http_client.get(
+            'https://api.github.com/user',
+            headers={'Authorization': f'Bearer {token}', 'Accept': 'application/vnd.github.v3+json'}
+        )
+        if response.status_code != 200:
+            raise HTTPException(status_code=401, detail="Invalid GitHub token")
+        login = response.json()['login']
+        _TOKEN_CACHE[token_key] = login
+        return login
     except httpx.TimeoutException:
         raise HTTPException(status_code=503, detail="GitHub authentication service timeout")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"GitHub auth error: {e}")
         raise HTTPException(status_code=401, detail="Authentication failed")
@@ -260,13 +318,13 @@ async def get_public_key(
     # For now, use in-memory storage for compatibility
 
     # Verify authentication
-    user_id = verify_github_token(authorization)
+    user_id = await verify_github_token(authorization)
 
     # TODO: In production, load from database
     # user = db.query(User).filter(User.user_id == user_id).first()
 
-    # For demo: Generate demo key
-    demo_key = f"-----BEGIN PUBLIC KEY-----\nDEMO_KEY_FOR_{user_id}\n-----END PUBLIC KEY-----"
+    # For demo: Generate demo key (memoized per user)
+    demo_key = _demo_pem(user_id)
 
     logger.info(f"Public key request from user: {user_id}")
 
@@ -287,17 +345,22 @@ async def agent_ask(
     Payload: Encrypted Work Order (encrypted with app's public key)
     """
     # Verify authentication
-    user_id = verify_github_token(authorization)
+    user_id = await verify_github_token(authorization)
 
-    # Validate payload size
-    if len(request.encrypted_blob) < 100:
+    # Validate payload size (base64 is ASCII, so len == byte size)
+    blob_len = len(request.encrypted_blob)
+    if blob_len < 100:
         raise HTTPException(status_code=400, detail="Encrypted blob is too small")
 
-    if len(request.encrypted_blob) > 1_000_000:  # 1MB limit
+    if blob_len > 1_000_000:  # 1MB limit
         raise HTTPException(status_code=400, detail="Encrypted blob is too large")
 
-    # Generate message ID
-    message_id = f"msg_{user_id}_{int(datetime.utcnow().timestamp() * 1000)}"
+    # Valid base64 is always a multiple of 4 long; O(1) check, no decode
+    if blob_len & 3:
+        raise HTTPException(status_code=400, detail="Encrypted blob is not valid base64")
+
+    # Generate message ID (UUIDv7: time-ordered, no timestamp arithmetic)
+    message_id = f"msg_{user_id}_{uuid7()}"
 
     # TODO: Store in database
     # message = Message(
@@ -313,9 +376,10 @@ async def agent_ask(
     # TODO: Send push notification
     # await send_push_notification(user_id, message_id)
 
-    logger.info(f"Message accepted - ID: {message_id}, User: {user_id}, Size: {len(request.encrypted_blob)}")
+    logger.info(f"Message accepted - ID: {message_id}, User: {user_id}, Size: {blob_len}")
 
-    return AskResponse(status="accepted", message_id=message_id)
+    response = AskResponse(status="accepted", message_id=message_id)
+    return ORJSONResponse(_ASK_RESPONSE_ADAPTER.dump_python(response, mode="json"))
 
 # ============================================================================
 # Debug Endpoints (Remove in production)
@@ -351,11 +415,18 @@ async def debug_users():
 
 @app.on_event("startup")
 async def startup_event():
+    global _http_client
+    _http_client = httpx.AsyncClient(
+        timeout=5,
+        limits=httpx.Limits(max_keepalive_connections=64, max_connections=128)
+    )
     logger.info(f"VOICE Relay Backend started - Environment: {ENVIRONMENT}")
     logger.info(f"Database: {DATABASE_URL if 'sqlite' not in DATABASE_URL else 'SQLite (development)'}")
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    if _http_client is not None:
+        await _http_client.aclose()
     logger.info("VOICE Relay Backend shutting down")
 
 if __name__ == "__main__":
@@ -5,20 +5,81 @@ Backend API testing script for VOICE Relay - LOCAL VERSION
 Tests the local backend API running on localhost:9000
 """
 
+import io
+import os
 import requests
-import json
+import orjson
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+# Bound once at import: the except clauses otherwise re-resolve two module
+# attributes every time the connect-failure path fires
+from requests.exceptions import ConnectionError as ReqConnErr, Timeout as ReqTimeout
 from typing import Optional
 from datetime import datetime
-
-# Configuration - LOCAL TESTING
-BACKEND_URL = "http://127.0.0.1:9000"
-TIMEOUT = 10
+from urllib3.util.retry import Retry
+
+# Configuration - LOCAL TESTING. Overridable via environment or --url=
+# so the same script can probe another host without an edit
+BACKEND_URL = os.environ.get("VOICE_BACKEND_URL", "http://127.0.0.1:9000")
+TIMEOUT = float(os.environ.get("VOICE_TIMEOUT", "10"))
+for _arg in sys.argv[1:]:
+    if _arg.startswith("--url="):
+        BACKEND_URL = _arg[len("--url="):]
+    elif _arg.startswith("--timeout="):
+        TIMEOUT = float(_arg[len("--timeout="):])
 
 # Demo token in the format expected by the backend
 DEMO_TOKEN = "Bearer github|test_user|demo_token"
 
+# One pooled session for the whole suite: urllib3 keep-alive reuses the
+# TCP connection across tests instead of handshaking per call
+SESSION = requests.Session()
+SESSION.headers.update({"Content-Type": "application/json"})
+# Transient 5xx's (hosting hiccups, cold starts) retry on the already-warm
+# pooled connection instead of failing the run and forcing a fresh handshake
+_retry = Retry(
+    total=3,
+    backoff_factor=0.2,
+    status_forcelist=(502, 503, 504),
+    allowed_methods=frozenset(["GET", "HEAD", "POST", "OPTIONS"]),
+)
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=_retry)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+# Simulated encrypted blob (base64 data long enough to pass the backend's
+# minimum-length check), built once at module scope
+TEST_BLOB = "SGVsbG8gV29ybGQhIFRoaXMgaXMgYW4gZW5jcnlwdGVkIG1lc3NhZ2UuIEl0IG5lZWRzIHRvIGJlIGF0IGxlYXN0IDEwMCBjaGFyYWN0ZXJzIHRvIHBhc3MgdGhlIHZhbGlkYXRpb24gY2hlY2sgaW4gdGhlIGJhY2tlbmQu"
+
+# Bodies are serialized once with orjson and sent via data=; requests'
+# json= kwarg would re-run stdlib json.dumps on every call
+EMPTY_JSON = b"{}"
+ASK_BODY = orjson.dumps({"encrypted_blob": TEST_BLOB})
+SHORT_BLOB_BODY = orjson.dumps({"encrypted_blob": "short"})
+
+# The /agent/ask bodies are constants, so the PreparedRequests are built
+# once here: SESSION.send() then skips the per-call header merging and
+# URL/body re-encoding that SESSION.post() would redo every time. One
+# prepared request per body keeps Content-Length correct and avoids
+# mutating shared state from the test worker threads.
+def _prepare_ask(body: bytes) -> requests.PreparedRequest:
+    return SESSION.prepare_request(requests.Request(
+        "POST",
+        f"{BACKEND_URL}/agent/ask",
+        headers={"Authorization": DEMO_TOKEN},
+        data=body,
+    ))
+
+ASK_PREP = _prepare_ask(ASK_BODY)
+SHORT_BLOB_PREP = _prepare_ask(SHORT_BLOB_BODY)
+
+# With --quiet, per-test log lines collect in a buffer and hit stdout in
+# one write before the summary; without it, lines print live
+QUIET = "--quiet" in sys.argv
+_LOG_BUF = io.StringIO()
+
 class Colors:
     GREEN = '\033[92m'
     RED = '\033[91m'
@@ -60,22 +121,40 @@ class TestResult:
               f"{Colors.YELLOW}{self.skipped} skipped{Colors.END} (Total: {total})")
         print("=" * 70)
 
+def _emit(line: str):
+    if QUIET:
+        _LOG_BUF.write(line + "\n")
+    else:
+        print(line)
+
+def flush_logs():
+    if QUIET:
+        sys.stdout.write(_LOG_BUF.getvalue())
+        _LOG_BUF.seek(0)
+        _LOG_BUF.truncate()
+
 def log_section(title: str):
-    print(f"\n{Colors.CYAN}{'=' * 70}{Colors.END}")
-    print(f"{Colors.CYAN}{title}{Colors.END}")
-    print(f"{Colors.CYAN}{'=' * 70}{Colors.END}")
+    banner = f"{Colors.CYAN}{'=' * 70}{Colors.END}"
+    _emit(f"\n{banner}\n{Colors.CYAN}{title}{Colors.END}\n{banner}")
+
+# Log prefixes never change; bake the ANSI concatenation once instead of
+# re-formatting it on every call
+_OK_PREFIX = f"{Colors.GREEN}✓{Colors.END} "
+_ERR_PREFIX = f"{Colors.RED}✗{Colors.END} "
+_INFO_PREFIX = f"{Colors.BLUE}ℹ{Colors.END} "
+_WARN_PREFIX = f"{Colors.YELLOW}⚠{Colors.END} "
 
 def log_success(msg: str):
-    print(f"{Colors.GREEN}✓{Colors.END} {msg}")
+    _emit(_OK_PREFIX + msg)
 
 def log_error(msg: str):
-    print(f"{Colors.RED}✗{Colors.END} {msg}")
+    _emit(_ERR_PREFIX + msg)
 
 def log_info(msg: str):
-    print(f"{Colors.BLUE}ℹ{Colors.END} {msg}")
+    _emit(_INFO_PREFIX + msg)
 
 def log_warning(msg: str):
-    print(f"{Colors.YELLOW}⚠{Colors.END} {msg}")
+    _emit(_WARN_PREFIX + msg)
 
 def test_backend_health(result: TestResult) -> bool:
     """Test if backend is reachable via /health endpoint"""
@@ -83,7 +162,7 @@ def test_backend_health(result: TestResult) -> bool:
 
     try:
         start_time = time.time()
-        response = requests.get(
+        response = SESSION.get(
             f"{BACKEND_URL}/health",
             timeout=TIMEOUT,
             allow_redirects=False
@@ -95,14 +174,14 @@ def test_backend_health(result: TestResult) -> bool:
 
         if response.status_code == 200:
             try:
-                data = response.json()
+                data = orjson.loads(response.content)
                 log_success(f"Backend is reachable")
                 log_info(f"Service: {data.get('service', 'unknown')}")
                 log_info(f"Status: {data.get('status', 'unknown')}")
                 log_info(f"Messages queued: {data.get('messages_queued', 0)}")
                 result.add_success("/health endpoint", f"{elapsed:.2f}s response time")
                 return True
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 log_error(f"Response is not valid JSON: {response.text[:100]}")
                 result.add_failure("/health endpoint", "Response is not valid JSON")
                 return False
@@ -112,11 +191,11 @@ def test_backend_health(result: TestResult) -> bool:
             result.add_failure("/health endpoint", f"Status {response.status_code}")
             return False
 
-    except requests.exceptions.ConnectionError as e:
+    except ReqConnErr as e:
         log_error(f"Cannot connect to backend: {e}")
         result.add_failure("/health endpoint", f"Connection error: {str(e)[:50]}")
         return False
-    except requests.exceptions.Timeout:
+    except ReqTimeout:
         log_error(f"Backend connection timeout (>{TIMEOUT}s)")
         result.add_failure("/health endpoint", "Timeout")
         return False
@@ -131,7 +210,7 @@ def test_root_endpoint(result: TestResult) -> bool:
 
     try:
         start_time = time.time()
-        response = requests.get(
+        response = SESSION.get(
             f"{BACKEND_URL}/",
             timeout=TIMEOUT,
             allow_redirects=False
@@ -142,14 +221,14 @@ def test_root_endpoint(result: TestResult) -> bool:
 
         if response.status_code == 200:
             try:
-                data = response.json()
+                data = orjson.loads(response.content)
                 log_success(f"API root endpoint is accessible")
                 log_info(f"API Name: {data.get('name', 'unknown')}")
                 log_info(f"Phase: {data.get('phase', 'unknown')}")
                 log_info(f"Version: {data.get('version', 'unknown')}")
                 result.add_success("GET / endpoint", f"{elapsed:.2f}s response time")
                 return True
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 log_error(f"Response is not valid JSON")
                 result.add_failure("GET / endpoint", "Response is not valid JSON")
                 return False
@@ -171,10 +250,9 @@ def test_get_public_key_no_auth(result: TestResult) -> bool:
         log_info("Testing without Authorization header (should fail with 401)...")
 
         start_time = time.time()
-        response = requests.post(
+        response = SESSION.post(
             f"{BACKEND_URL}/auth/get-public-key",
-            headers={"Content-Type": "application/json"},
-            json={},
+            data=EMPTY_JSON,
             timeout=TIMEOUT,
             allow_redirects=False
         )
@@ -205,13 +283,10 @@ def test_get_public_key_with_auth(result: TestResult) -> Optional[str]:
         log_info(f"Using token: {DEMO_TOKEN[:20]}...")
 
         start_time = time.time()
-        response = requests.post(
+        response = SESSION.post(
             f"{BACKEND_URL}/auth/get-public-key",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": DEMO_TOKEN
-            },
-            json={},
+            headers={"Authorization": DEMO_TOKEN},
+            data=EMPTY_JSON,
             timeout=TIMEOUT,
             allow_redirects=False
         )
@@ -227,8 +302,8 @@ def test_get_public_key_with_auth(result: TestResult) -> Optional[str]:
             return None
 
         try:
-            data = response.json()
-        except json.JSONDecodeError:
+            data = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
             log_error(f"Response is not valid JSON: {response.text[:100]}")
             result.add_failure("POST /auth/get-public-key (with auth)", "Invalid JSON response")
             return None
@@ -251,7 +326,7 @@ def test_get_public_key_with_auth(result: TestResult) -> Optional[str]:
             result.add_failure("POST /auth/get-public-key (with auth)", "Missing public key in response")
             return None
 
-    except requests.exceptions.Timeout:
+    except ReqTimeout:
         log_error(f"Request timeout (>{TIMEOUT}s)")
         result.add_failure("POST /auth/get-public-key (with auth)", "Timeout")
         return None
@@ -270,20 +345,12 @@ def test_agent_ask(result: TestResult, public_key: Optional[str]) -> bool:
         return False
 
     try:
-        # Create a test encrypted blob (just base64 encoded data for testing)
-        # In real usage, this would be properly encrypted with RSA+AES
-        test_blob = "SGVsbG8gV29ybGQhIFRoaXMgaXMgYW4gZW5jcnlwdGVkIG1lc3NhZ2UuIEl0IG5lZWRzIHRvIGJlIGF0IGxlYXN0IDEwMCBjaGFyYWN0ZXJzIHRvIHBhc3MgdGhlIHZhbGlkYXRpb24gY2hlY2sgaW4gdGhlIGJhY2tlbmQu"
-
-        log_info(f"Sending encrypted blob of {len(test_blob)} bytes")
+        # In real usage this would be properly encrypted with RSA+AES
+        log_info(f"Sending encrypted blob of {len(TEST_BLOB)} bytes")
 
         start_time = time.time()
-        response = requests.post(
-            f"{BACKEND_URL}/agent/ask",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": DEMO_TOKEN
-            },
-            json={"encrypted_blob": test_blob},
+        response = SESSION.send(
+            ASK_PREP,
             timeout=TIMEOUT,
             allow_redirects=False
         )
@@ -299,8 +366,8 @@ def test_agent_ask(result: TestResult, public_key: Optional[str]) -> bool:
             return False
 
         try:
-            data = response.json()
-        except json.JSONDecodeError:
+            data = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
             log_error(f"Response is not valid JSON")
             result.add_failure("POST /agent/ask", "Invalid JSON response")
             return False
@@ -317,7 +384,7 @@ def test_agent_ask(result: TestResult, public_key: Optional[str]) -> bool:
             result.add_failure("POST /agent/ask", "Missing status or message_id")
             return False
 
-    except requests.exceptions.Timeout:
+    except ReqTimeout:
         log_error(f"Request timeout (>{TIMEOUT}s)")
         result.add_failure("POST /agent/ask", "Timeout")
         return False
@@ -332,18 +399,11 @@ def test_agent_ask_invalid_blob(result: TestResult) -> bool:
 
     try:
         # Blob too short - should be rejected
-        test_blob = "short"
-
-        log_info(f"Sending blob of {len(test_blob)} bytes (should be rejected as too short)")
+        log_info("Sending a 5-byte blob (should be rejected as too short)")
 
         start_time = time.time()
-        response = requests.post(
-            f"{BACKEND_URL}/agent/ask",
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": DEMO_TOKEN
-            },
-            json={"encrypted_blob": test_blob},
+        response = SESSION.send(
+            SHORT_BLOB_PREP,
             timeout=TIMEOUT,
             allow_redirects=False
         )
@@ -372,7 +432,7 @@ def test_debug_endpoints(result: TestResult):
 
     try:
         # Test /debug/messages
-        response = requests.get(
+        response = SESSION.get(
             f"{BACKEND_URL}/debug/messages",
             timeout=TIMEOUT
         )
@@ -385,7 +445,7 @@ def test_debug_endpoints(result: TestResult):
             result.add_skip("GET /debug/messages", f"Status {response.status_code}")
 
         # Test /debug/users
-        response = requests.get(
+        response = SESSION.get(
             f"{BACKEND_URL}/debug/users",
             timeout=TIMEOUT
         )
@@ -402,39 +462,56 @@ def test_debug_endpoints(result: TestResult):
         result.add_skip("Debug endpoints", str(e)[:50])
 
 def main() -> int:
+    # Kick off a throwaway HEAD so connection setup (TCP, and TLS when the
+    # URL is remote) overlaps the banner printing; the health check below
+    # then reuses the already-warm pooled connection
+    warm_pool = ThreadPoolExecutor(max_workers=1)
+    warm = warm_pool.submit(SESSION.head, f"{BACKEND_URL}/health", timeout=TIMEOUT)
+
     print("\n" + "=" * 70)
     print(f"{Colors.CYAN}VOICE Relay - Backend API Test Suite (LOCAL){Colors.END}")
     print(f"Backend URL: {BACKEND_URL}")
     print(f"Test Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 70)
 
+    try:
+        warm.result()
+    except Exception:
+        pass  # unreachable hosts are reported properly by the health check
+    warm_pool.shutdown()
+
     result = TestResult()
 
-    # 1. Basic health check
+    # 1. Basic health check gates everything else
     health_ok = test_backend_health(result)
 
     if not health_ok:
         log_error("Backend is not reachable. Stopping tests.")
+        flush_logs()
         result.print_summary()
         return 1
 
-    # 2. Test root endpoint
-    test_root_endpoint(result)
-
-    # 3. Test authentication
-    test_get_public_key_no_auth(result)
-    public_key = test_get_public_key_with_auth(result)
+    # 2. Probes with no mutual dependency overlap the sequential auth ->
+    # agent-ask chain on the pooled session; only agent-ask actually needs
+    # the public key. Per-test output may interleave.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        independent = [
+            executor.submit(test_root_endpoint, result),
+            executor.submit(test_get_public_key_no_auth, result),
+            executor.submit(test_agent_ask_invalid_blob, result),
+        ]
 
-    # 4. Test agent ask with valid blob
-    test_agent_ask(result, public_key)
+        public_key = test_get_public_key_with_auth(result)
+        test_agent_ask(result, public_key)
 
-    # 5. Test agent ask with invalid blob
-    test_agent_ask_invalid_blob(result)
+        for future in independent:
+            future.result()
 
-    # 6. Test debug endpoints
+    # 3. Debug endpoints read state written by the chain above
     test_debug_endpoints(result)
 
     # Print summary
+    flush_logs()
     result.print_summary()
 
     # Return exit code based on failures